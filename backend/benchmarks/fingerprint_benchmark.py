@@ -0,0 +1,105 @@
+# Fingerprint lookup throughput benchmark
+# Builds an in-memory index from synthetic songs and times clip lookups against it
+# Run from the backend folder: python -m benchmarks.fingerprint_benchmark --songs 50
+# Copy and paste everything into backend/benchmarks/fingerprint_benchmark.py
+
+import argparse
+import json
+import time
+import numpy as np
+from services.fingerprint_index import (
+    SAMPLE_RATE, new_index, fingerprint_samples, add_landmarks, lookup_landmarks
+)
+
+
+def synthesize_song(rng: np.random.Generator, duration: float) -> np.ndarray:
+    # A sequence of random three-note chords is enough to give each song distinct peaks
+    note_length = 0.25
+    note_samples = int(note_length * SAMPLE_RATE)
+    t = np.arange(note_samples) / SAMPLE_RATE
+    envelope = np.hanning(note_samples)
+
+    notes = []
+    for _ in range(int(duration / note_length)):
+        freqs = rng.uniform(100, 4000, size=3)
+        chord = sum(np.sin(2 * np.pi * f * t) for f in freqs)
+        notes.append(chord * envelope)
+
+    song = np.concatenate(notes)
+    return (song / np.max(np.abs(song))).astype(np.float32)
+
+
+def run_benchmark(song_count: int, song_duration: float, clip_duration: float,
+                  lookups: int, noise_level: float, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    index = new_index()
+    songs = {}
+
+    build_start = time.perf_counter()
+    for i in range(song_count):
+        song_id = f"song_{i}"
+        songs[song_id] = synthesize_song(rng, song_duration)
+        add_landmarks(index, song_id, fingerprint_samples(songs[song_id]))
+    build_seconds = time.perf_counter() - build_start
+
+    clip_samples = int(clip_duration * SAMPLE_RATE)
+    correct = 0
+    offset_errors = []
+    fingerprint_seconds = 0.0
+    lookup_seconds = 0.0
+
+    for _ in range(lookups):
+        song_id = f"song_{rng.integers(song_count)}"
+        song = songs[song_id]
+        start = int(rng.integers(0, len(song) - clip_samples))
+        clip = song[start:start + clip_samples]
+        clip = clip + rng.normal(0, noise_level, size=len(clip)).astype(np.float32)
+
+        fingerprint_start = time.perf_counter()
+        landmarks = fingerprint_samples(clip)
+        lookup_start = time.perf_counter()
+        match = lookup_landmarks(index, landmarks)
+        lookup_end = time.perf_counter()
+
+        fingerprint_seconds += lookup_start - fingerprint_start
+        lookup_seconds += lookup_end - lookup_start
+
+        if match and match["song_id"] == song_id:
+            correct += 1
+            offset_errors.append(abs(match["offset"] - start / SAMPLE_RATE))
+
+    return {
+        "songs": song_count,
+        "song_duration": song_duration,
+        "clip_duration": clip_duration,
+        "lookups": lookups,
+        "noise_level": noise_level,
+        "index_hashes": len(index["hashes"]),
+        "build_seconds": round(build_seconds, 3),
+        "fingerprint_ms_per_clip": round(fingerprint_seconds / lookups * 1000, 3),
+        "lookup_ms_per_clip": round(lookup_seconds / lookups * 1000, 3),
+        "lookups_per_second": round(lookups / lookup_seconds, 1) if lookup_seconds else None,
+        "accuracy": round(correct / lookups, 3),
+        "max_offset_error": round(max(offset_errors), 3) if offset_errors else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fingerprint index lookups")
+    parser.add_argument("--songs", type=int, default=20)
+    parser.add_argument("--song-duration", type=float, default=180)
+    parser.add_argument("--clip-duration", type=float, default=10)
+    parser.add_argument("--lookups", type=int, default=100)
+    parser.add_argument("--noise", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        args.songs, args.song_duration, args.clip_duration,
+        args.lookups, args.noise, args.seed
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
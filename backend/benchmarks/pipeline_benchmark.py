@@ -0,0 +1,331 @@
+# End-to-end pipeline benchmark with synthetic media
+# Generates songs and clips with ffmpeg lavfi sources, cuts each artist clip's audio from the
+# song at a known offset, then times every pipeline step and checks the offsets it finds
+# Run from the backend folder:
+#   python -m benchmarks.pipeline_benchmark --clips 2,4 --song-lengths 30,60 --resolutions 640x360
+#   python -m benchmarks.pipeline_benchmark --compare benchmarks/results/<earlier run>.json
+# Copy and paste everything into backend/benchmarks/pipeline_benchmark.py
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import itertools
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from services.audio_analysis import analyze_audio
+from services.video_analysis import analyze_clip
+from services.matching_engine import extract_audio_ffmpeg, find_sync_offset, build_edit_decision_list
+from services.renderer import render_music_video
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# An offset counts as correct if it lands within this many seconds of the real one
+SYNC_TOLERANCE = 0.05
+
+# A step counts as a regression if it got this much slower than the compared run
+REGRESSION_THRESHOLD = 1.2
+
+
+def run_ffmpeg(args: list):
+    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"] + args
+    subprocess.run(cmd, check=True, capture_output=True)
+
+
+def generate_song(path: str, duration: float, seed: int):
+    # Seeded pink noise under a steady kick gives cross-correlation a unique match
+    # and gives beat tracking something to find
+    run_ffmpeg([
+        "-f", "lavfi", "-i", f"anoisesrc=d={duration}:c=pink:r=44100:a=0.3:seed={seed}",
+        "-f", "lavfi", "-i", f"aevalsrc='sin(2*PI*60*t)*exp(-20*mod(t,0.5))':d={duration}:s=44100",
+        "-filter_complex", "amix=inputs=2:duration=first",
+        "-ac", "2", path
+    ])
+
+
+def generate_artist_clip(path: str, song_path: str, offset: float, duration: float,
+                         resolution: str, fps: int):
+    # Video is a test pattern, audio is the song itself starting at the known offset
+    run_ffmpeg([
+        "-f", "lavfi", "-i", f"testsrc2=size={resolution}:rate={fps}:d={duration}",
+        "-ss", str(offset), "-t", str(duration), "-i", song_path,
+        "-map", "0:v", "-map", "1:a",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest", path
+    ])
+
+
+def generate_broll_clip(path: str, duration: float, resolution: str, fps: int):
+    run_ffmpeg([
+        "-f", "lavfi", "-i", f"smptehdbars=size={resolution}:rate={fps}:d={duration}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", path
+    ])
+
+
+def generate_project(project_dir: str, clip_count: int, song_length: float,
+                     resolution: str, clip_length: float, fps: int, seed: int) -> dict:
+    artist_dir = os.path.join(project_dir, "artist_clips")
+    broll_dir = os.path.join(project_dir, "broll_clips")
+    os.makedirs(artist_dir, exist_ok=True)
+    os.makedirs(broll_dir, exist_ok=True)
+
+    song_path = os.path.join(project_dir, "song.wav")
+    generate_song(song_path, song_length, seed)
+
+    # Spread artist clips evenly across the song, leaving gaps for b-roll
+    offsets = {}
+    spacing = (song_length - clip_length) / clip_count
+    for i in range(clip_count):
+        filename = f"artist_{i}.mp4"
+        offset = round(spacing * i + spacing / 2, 2)
+        generate_artist_clip(os.path.join(artist_dir, filename), song_path, offset,
+                             clip_length, resolution, fps)
+        offsets[filename] = offset
+
+    generate_broll_clip(os.path.join(broll_dir, "broll_0.mp4"), clip_length, resolution, fps)
+
+    return {"song_path": song_path, "offsets": offsets}
+
+
+def time_call(repeat: int, func, *args):
+    # Returns the last result plus min/median wall time over the repeats
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return result, {"min": round(min(timings), 4), "median": round(statistics.median(timings), 4)}
+
+
+def check_offsets(found: dict, expected: dict) -> dict:
+    errors = {
+        filename: round(abs(found[filename] - offset), 3) if filename in found else None
+        for filename, offset in expected.items()
+    }
+    correct = [e for e in errors.values() if e is not None and e <= SYNC_TOLERANCE]
+    return {
+        "correct": len(correct),
+        "total": len(expected),
+        "max_error": max((e for e in errors.values() if e is not None), default=None),
+        "errors": errors
+    }
+
+
+def summarize_per_clip(timings: list) -> dict:
+    if not timings:
+        return None
+    return {
+        "per_clip_median": round(statistics.median(timings), 4),
+        "total": round(sum(timings), 4)
+    }
+
+
+def warm_up(tmp_dir: str, project_dir: str, project: dict, skip_render: bool):
+    # Run every step once untimed, so librosa's imports and numba JIT compiles (or cache
+    # loads) aren't billed to whichever scenario happens to be timed first
+    song_path = project["song_path"]
+    clip_path = os.path.join(project_dir, "artist_clips", sorted(project["offsets"])[0])
+    clip_audio_path = os.path.join(tmp_dir, "warmup_audio.wav")
+
+    audio_analysis = analyze_audio(song_path)
+    analyze_clip(clip_path)
+    if extract_audio_ffmpeg(clip_path, clip_audio_path):
+        find_sync_offset(song_path, clip_audio_path)
+        os.remove(clip_audio_path)
+    edit_decision_list = build_edit_decision_list(song_path, project_dir, audio_analysis)
+    if not skip_render:
+        render_music_video(edit_decision_list, os.path.join(tmp_dir, "warmup_output"))
+
+
+def run_scenario(clip_count: int, song_length: float, resolution: str, clip_length: float,
+                 fps: int, repeat: int, skip_render: bool, seed: int,
+                 warm: bool = False) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project_dir = os.path.join(tmp_dir, "project")
+        project = generate_project(project_dir, clip_count, song_length, resolution,
+                                   clip_length, fps, seed)
+        song_path = project["song_path"]
+        artist_dir = os.path.join(project_dir, "artist_clips")
+        timings = {}
+
+        if warm:
+            print("Warming up on this scenario's project before timing...")
+            warm_up(tmp_dir, project_dir, project, skip_render)
+
+        audio_analysis, timings["analyze_audio"] = time_call(repeat, analyze_audio, song_path)
+
+        clip_timings = []
+        sync_timings = []
+        sync_offsets = {}
+        for filename in sorted(project["offsets"]):
+            clip_path = os.path.join(artist_dir, filename)
+            _, clip_time = time_call(repeat, analyze_clip, clip_path)
+            clip_timings.append(clip_time["median"])
+
+            clip_audio_path = os.path.join(tmp_dir, f"{filename}_audio.wav")
+            if not extract_audio_ffmpeg(clip_path, clip_audio_path):
+                continue
+            offset, sync_time = time_call(repeat, find_sync_offset, song_path, clip_audio_path)
+            sync_timings.append(sync_time["median"])
+            sync_offsets[filename] = offset
+
+        timings["analyze_clip"] = summarize_per_clip(clip_timings)
+        timings["find_sync_offset"] = summarize_per_clip(sync_timings)
+
+        edit_decision_list, timings["build_edit_decision_list"] = time_call(
+            repeat, build_edit_decision_list, song_path, project_dir, audio_analysis
+        )
+        placement_offsets = {
+            placement["filename"]: placement["start_time"]
+            for placement in edit_decision_list["placements"]
+            if placement["type"] == "artist"
+        }
+
+        if not skip_render:
+            output_dir = os.path.join(tmp_dir, "output")
+            _, timings["render_music_video"] = time_call(
+                repeat, render_music_video, edit_decision_list, output_dir
+            )
+
+    return {
+        "name": f"clips={clip_count},song={song_length:g}s,res={resolution}",
+        "clips": clip_count,
+        "song_length": song_length,
+        "resolution": resolution,
+        "clip_length": clip_length,
+        "fps": fps,
+        "timings": timings,
+        "sync_accuracy": check_offsets(sync_offsets, project["offsets"]),
+        "placement_accuracy": check_offsets(placement_offsets, project["offsets"])
+    }
+
+
+def step_seconds(timing: dict) -> float:
+    # Whole-call timings report median, per-clip timings report their total
+    if not timing:
+        return None
+    return timing.get("median", timing.get("total"))
+
+
+def command_output(cmd: list) -> str:
+    # First line of a command's output, or None if it isn't available
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        return result.stdout.strip().splitlines()[0] if result.returncode == 0 else None
+    except (OSError, IndexError, subprocess.SubprocessError):
+        return None
+
+
+def get_environment() -> dict:
+    # Recorded with the results so runs on different machines aren't compared blindly
+    return {
+        "commit": command_output(["git", "rev-parse", "--short", "HEAD"]),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": command_output(["ffmpeg", "-version"])
+    }
+
+
+def compare_results(current: dict, previous: dict) -> list:
+    # Returns one line per step that got slower than REGRESSION_THRESHOLD allows
+    previous_scenarios = {scenario["name"]: scenario for scenario in previous["scenarios"]}
+    regressions = []
+
+    for scenario in current["scenarios"]:
+        old = previous_scenarios.get(scenario["name"])
+        if not old:
+            continue
+        for step, timing in scenario["timings"].items():
+            new_seconds = step_seconds(timing)
+            old_seconds = step_seconds(old["timings"].get(step))
+            if not new_seconds or not old_seconds:
+                continue
+            ratio = new_seconds / old_seconds
+            line = f"{scenario['name']} {step}: {old_seconds:.3f}s -> {new_seconds:.3f}s ({ratio:.2f}x)"
+            print(line)
+            if ratio > REGRESSION_THRESHOLD:
+                regressions.append(line)
+
+    return regressions
+
+
+def parse_list(value: str, cast) -> list:
+    return [cast(item) for item in value.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the music video pipeline on synthetic media")
+    parser.add_argument("--clips", default="2,4", help="comma separated artist clip counts")
+    parser.add_argument("--song-lengths", default="30", help="comma separated song lengths in seconds")
+    parser.add_argument("--resolutions", default="640x360", help="comma separated WxH resolutions")
+    parser.add_argument("--clip-length", type=float, default=5)
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip-render", action="store_true")
+    parser.add_argument("--output", help="where to save the JSON results")
+    parser.add_argument("--compare", help="earlier results JSON to check for regressions")
+    args = parser.parse_args()
+
+    scenarios = []
+    grid = itertools.product(
+        parse_list(args.clips, int),
+        parse_list(args.song_lengths, float),
+        parse_list(args.resolutions, str)
+    )
+    for clip_count, song_length, resolution in grid:
+        if clip_count * args.clip_length > song_length:
+            print(f"Skipping {clip_count} clips in a {song_length:g}s song, they don't fit")
+            continue
+        print(f"Running clips={clip_count} song={song_length:g}s res={resolution}...")
+        scenarios.append(run_scenario(
+            clip_count, song_length, resolution, args.clip_length,
+            args.fps, args.repeat, args.skip_render, args.seed,
+            warm=not scenarios
+        ))
+
+    settings = vars(args)
+    settings["warm_up"] = "every step run once untimed on the first scenario's project"
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": get_environment(),
+        "settings": settings,
+        "scenarios": scenarios
+    }
+
+    output_path = args.output
+    if not output_path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output_path = os.path.join(RESULTS_DIR, f"{stamp}-{results['environment']['commit'] or 'nogit'}.json")
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to {output_path}")
+
+    failed_sync = [
+        scenario["name"] for scenario in scenarios
+        for check in ("sync_accuracy", "placement_accuracy")
+        if scenario[check]["correct"] < scenario[check]["total"]
+    ]
+    for name in sorted(set(failed_sync)):
+        print(f"Sync check failed: {name}")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_results(results, json.load(f))
+        for line in regressions:
+            print(f"Regression: {line}")
+
+    if failed_sync or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Startup benchmark - how long a fresh process takes to import things and answer /health
+# Every measurement runs in a new Python process so nothing is already imported or cached
+# Run from the backend folder: python -m benchmarks.startup_benchmark --runs 5
+# Copy and paste everything into backend/benchmarks/startup_benchmark.py
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# main is what the web server imports; the rest are the heavy stacks it now loads lazily
+# (librosa itself loads lazily, so librosa.beat is what pulls in numba and scikit-learn)
+MODULES = ["main", "boto3", "librosa.beat", "moviepy", "cv2"]
+
+
+def time_import(module: str) -> float:
+    # Time only the import itself, not interpreter startup
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR,
+        capture_output=True, text=True, timeout=300
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def time_warmup() -> float:
+    code = (
+        "import time; start = time.perf_counter(); "
+        "from services.warmup import warm_media_stack; warm_media_stack(); "
+        "print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR,
+        capture_output=True, text=True, timeout=600
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_until_healthy(timeout: float = 120) -> float:
+    # Start uvicorn the way render.yaml does and poll /health until it answers
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                return None
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.05)
+        return None
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def summarize(timings: list) -> dict:
+    timings = [t for t in timings if t is not None]
+    if not timings:
+        return None
+    return {"min": round(min(timings), 3), "median": round(statistics.median(timings), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time and server startup")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--skip-warmup", action="store_true")
+    parser.add_argument("--output", help="where to save the JSON results")
+    args = parser.parse_args()
+
+    results = {"python": sys.version.split()[0], "runs": args.runs, "imports": {}}
+    for module in MODULES:
+        results["imports"][module] = summarize([time_import(module) for _ in range(args.runs)])
+    results["time_to_health"] = summarize([time_until_healthy() for _ in range(args.runs)])
+
+    # The first warm-up compiles librosa's numba functions into the cache, later ones load them
+    if not args.skip_warmup:
+        results["warmup"] = {
+            "first": summarize([time_warmup()]),
+            "cached": summarize([time_warmup() for _ in range(args.runs)])
+        }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,34 @@
 # Main entry point for the backend server
 # Copy and paste everything into backend/main.py
 
+# The routers only import librosa, MoviePy, OpenCV and boto3 when a request needs them,
+# so the server can answer /health within a moment of starting
+
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from services.warmup import enable_numba_cache, prewarm_in_background
 from routes.upload import router as upload_router
 from routes.analyze import router as analyze_router
 from routes.generate import router as generate_router
 from routes.render import router as render_router
+from routes.fingerprint import router as fingerprint_router
+
+# Cache librosa's numba compilations on disk so restarts skip the JIT
+enable_numba_cache()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # PREWARM_MEDIA=1 loads the media stack in the background right after startup,
+    # so the first render doesn't wait for it
+    if os.getenv("PREWARM_MEDIA") == "1":
+        prewarm_in_background()
+    yield
+
 
-app = FastAPI(title="MusicVideo AI", version="1.0.0")
+app = FastAPI(title="MusicVideo AI", version="1.0.0", lifespan=lifespan)
 
 # Allow frontend to talk to backend
 app.add_middleware(
@@ -24,6 +44,7 @@ app.include_router(upload_router, prefix="/api")
 app.include_router(analyze_router, prefix="/api")
 app.include_router(generate_router, prefix="/api")
 app.include_router(render_router, prefix="/api")
+app.include_router(fingerprint_router, prefix="/api")
 
 @app.get("/")
 def root():
@@ -4,8 +4,6 @@
 
 import os
 from fastapi import APIRouter, HTTPException
-from services.audio_analysis import analyze_audio
-from services.video_analysis import analyze_all_clips
 
 router = APIRouter()
 
@@ -13,6 +11,10 @@ UPLOAD_DIR = "uploads"
 
 @router.post("/analyze/{project_id}")
 def analyze_project(project_id: str):
+    # Imported here so librosa and OpenCV only load once analysis is actually needed
+    from services.audio_analysis import analyze_audio
+    from services.video_analysis import analyze_all_clips
+
     # Find the project folder
     project_dir = os.path.join(UPLOAD_DIR, project_id)
     if not os.path.exists(project_dir):
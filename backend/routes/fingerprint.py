@@ -0,0 +1,43 @@
+# Fingerprint lookup endpoint - finds which uploaded song a clip belongs to
+# Copy and paste everything into backend/routes/fingerprint.py
+
+import os
+import shutil
+import tempfile
+from fastapi import APIRouter, UploadFile, File, HTTPException
+
+router = APIRouter()
+
+
+@router.post("/fingerprint/lookup")
+def lookup_clip_song(clip: UploadFile = File(...)):
+    # Imported here so librosa only loads once a lookup is actually requested
+    from services.fingerprint_index import get_index, lookup_clip
+    from services.matching_engine import extract_audio_ffmpeg
+
+    if not clip.filename.lower().endswith((".mp4", ".mov", ".avi", ".mp3", ".wav")):
+        raise HTTPException(status_code=400, detail=f"{clip.filename} is not a valid media file")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        clip_path = os.path.join(tmp_dir, os.path.basename(clip.filename))
+        with open(clip_path, "wb") as f:
+            shutil.copyfileobj(clip.file, f)
+
+        clip_audio_path = os.path.join(tmp_dir, "clip_audio.wav")
+        if not extract_audio_ffmpeg(clip_path, clip_audio_path):
+            raise HTTPException(status_code=400, detail="Could not extract audio from clip")
+
+        match = lookup_clip(clip_audio_path)
+
+    if not match:
+        raise HTTPException(status_code=404, detail="No matching song found")
+
+    song_info = get_index()["songs"].get(match["song_id"], {})
+    return {
+        "filename": clip.filename,
+        "song_id": match["song_id"],
+        "song_name": song_info.get("name"),
+        "offset": match["offset"],
+        "score": match["score"],
+        "confidence": match["confidence"]
+    }
@@ -3,8 +3,6 @@
 
 import os
 from fastapi import APIRouter, HTTPException
-from services.audio_analysis import analyze_audio
-from services.matching_engine import build_edit_decision_list
 
 router = APIRouter()
 
@@ -12,6 +10,10 @@ UPLOAD_DIR = "uploads"
 
 @router.post("/generate/{project_id}")
 def generate_edit(project_id: str):
+    # Imported here so librosa and MoviePy only load once matching is actually needed
+    from services.audio_analysis import analyze_audio
+    from services.matching_engine import build_edit_decision_list
+
     project_dir = os.path.join(UPLOAD_DIR, project_id)
     if not os.path.exists(project_dir):
         raise HTTPException(status_code=404, detail="Project not found")
@@ -33,7 +35,8 @@ def generate_edit(project_id: str):
     edit_decision_list = build_edit_decision_list(
         song_file,
         project_dir,
-        audio_analysis
+        audio_analysis,
+        song_id=project_id
     )
 
     return {
@@ -2,15 +2,22 @@
 # Copy and paste everything into backend/routes/render.py
 
 import os
+import json
+import asyncio
 import threading
 import tempfile
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import RedirectResponse
-from services.audio_analysis import analyze_audio
-from services.matching_engine import build_edit_decision_list
-from services.renderer import render_music_video
-from services.s3_storage import download_file_from_s3, upload_file_to_s3, get_presigned_url
-import boto3
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse, PlainTextResponse, FileResponse, StreamingResponse
+from services.s3_storage import (
+    get_s3_client, download_file_from_s3, upload_file_to_s3, get_presigned_url
+)
+from services.pipeline_metrics import (
+    PROFILERS, start_job_metrics, finish_job_metrics, get_job_metrics, stage, clip_span,
+    profile_job, profiler_available, get_profile_path, render_prometheus
+)
+from services.progress_events import (
+    publish, subscribe, unsubscribe, reset_progress, set_current_job, clear_current_job
+)
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,81 +25,134 @@ load_dotenv()
 router = APIRouter()
 
 BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
+KEEPALIVE_SECONDS = 15
 job_status = {}
+_start_lock = threading.Lock()
 
 def list_s3_files(prefix: str) -> list:
-    s3 = boto3.client(
-        "s3",
-        region_name=os.getenv("AWS_REGION"),
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-    )
-    response = s3.list_objects_v2(Bucket=BUCKET_NAME, Prefix=prefix)
+    response = get_s3_client().list_objects_v2(Bucket=BUCKET_NAME, Prefix=prefix)
     if "Contents" not in response:
         return []
     return [obj["Key"] for obj in response["Contents"]]
 
 
-def run_render_job(project_id: str):
+def set_status(project_id: str, status: str, message: str, stage_name: str = None):
+    # Every status change is also pushed to anyone listening on /api/progress
+    job_status[project_id] = {"status": status, "message": message}
+    publish(project_id, "status", status=status, message=message, stage=stage_name)
+
+
+def make_upload_callback(project_id: str, total_bytes: int):
+    # boto3 calls this from its transfer threads with the size of each chunk sent
+    lock = threading.Lock()
+    progress = {"bytes": 0, "percent": None}
+
+    def callback(bytes_sent: int):
+        with lock:
+            progress["bytes"] += bytes_sent
+            sent = progress["bytes"]
+            percent = int(sent * 100 / total_bytes) if total_bytes else 100
+            if percent == progress["percent"]:
+                return
+            progress["percent"] = percent
+        publish(project_id, "upload", bytes=sent, total_bytes=total_bytes, percent=percent)
+
+    return callback
+
+
+def run_render_job(project_id: str, profiler: str = None):
+    job_token = start_job_metrics(project_id)
+    set_current_job(project_id)
     try:
-        job_status[project_id] = {"status": "processing", "message": "Downloading files..."}
+        with profile_job(project_id, profiler):
+            render_project(project_id)
+    except Exception as e:
+        set_status(project_id, "error", str(e))
+    finally:
+        clear_current_job()
+        finish_job_metrics(job_token, job_status[project_id]["status"])
+
+
+def render_project(project_id: str):
+    # The media stacks load on the first render instead of when the server starts
+    from services.audio_analysis import analyze_audio
+    from services.matching_engine import build_edit_decision_list
+    from services.renderer import render_music_video
+
+    set_status(project_id, "processing", "Downloading files...", "download")
 
-        # Create temp workspace
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            project_dir = os.path.join(tmp_dir, project_id)
-            artist_dir = os.path.join(project_dir, "artist_clips")
-            broll_dir = os.path.join(project_dir, "broll_clips")
-            os.makedirs(artist_dir, exist_ok=True)
-            os.makedirs(broll_dir, exist_ok=True)
+    # Create temp workspace
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project_dir = os.path.join(tmp_dir, project_id)
+        artist_dir = os.path.join(project_dir, "artist_clips")
+        broll_dir = os.path.join(project_dir, "broll_clips")
+        os.makedirs(artist_dir, exist_ok=True)
+        os.makedirs(broll_dir, exist_ok=True)
 
-            # Download song from S3
+        with stage("download"):
             song_files = list_s3_files(f"projects/{project_id}/song/")
             if not song_files:
-                job_status[project_id] = {"status": "error", "message": "No song found"}
+                set_status(project_id, "error", "No song found")
                 return
 
             song_key = song_files[0]
-            song_filename = song_key.split("/")[-1]
-            song_local = os.path.join(project_dir, song_filename)
-            download_file_from_s3(song_key, song_local)
-
-            # Download artist clips from S3
-            artist_keys = list_s3_files(f"projects/{project_id}/artist_clips/")
-            for key in artist_keys:
-                filename = key.split("/")[-1]
-                download_file_from_s3(key, os.path.join(artist_dir, filename))
-
-            # Download broll clips from S3
-            broll_keys = list_s3_files(f"projects/{project_id}/broll_clips/")
-            for key in broll_keys:
-                filename = key.split("/")[-1]
-                download_file_from_s3(key, os.path.join(broll_dir, filename))
-
-            job_status[project_id] = {"status": "processing", "message": "Analyzing audio..."}
+            song_local = os.path.join(project_dir, song_key.split("/")[-1])
+
+            # Song first, then artist clips, then broll clips
+            downloads = [(song_key, song_local)]
+            for key in list_s3_files(f"projects/{project_id}/artist_clips/"):
+                downloads.append((key, os.path.join(artist_dir, key.split("/")[-1])))
+            for key in list_s3_files(f"projects/{project_id}/broll_clips/"):
+                downloads.append((key, os.path.join(broll_dir, key.split("/")[-1])))
+
+            for i, (key, local_path) in enumerate(downloads, start=1):
+                filename = os.path.basename(local_path)
+                with clip_span(filename, "download"):
+                    download_file_from_s3(key, local_path)
+                publish(project_id, "download", done=i, total=len(downloads), filename=filename)
+
+        set_status(project_id, "processing", "Analyzing audio...", "analyze_audio")
+        with stage("analyze_audio"):
             audio_analysis = analyze_audio(song_local)
 
-            job_status[project_id] = {"status": "processing", "message": "Matching clips..."}
-            edit_decision_list = build_edit_decision_list(song_local, project_dir, audio_analysis)
+        set_status(project_id, "processing", "Matching clips...", "build_edit_decision_list")
+        with stage("build_edit_decision_list"):
+            edit_decision_list = build_edit_decision_list(
+                song_local, project_dir, audio_analysis, song_id=project_id
+            )
 
-            job_status[project_id] = {"status": "processing", "message": "Rendering video..."}
-            output_dir = os.path.join(tmp_dir, "output")
-            os.makedirs(output_dir, exist_ok=True)
+        set_status(project_id, "processing", "Rendering video...", "render_music_video")
+        output_dir = os.path.join(tmp_dir, "output")
+        os.makedirs(output_dir, exist_ok=True)
+        with stage("render_music_video"):
             output_path = render_music_video(edit_decision_list, output_dir)
 
-            job_status[project_id] = {"status": "processing", "message": "Uploading to cloud..."}
-            s3_output_key = f"projects/{project_id}/output/music_video.mp4"
-            upload_file_to_s3(output_path, s3_output_key)
+        set_status(project_id, "processing", "Uploading to cloud...", "upload")
+        s3_output_key = f"projects/{project_id}/output/music_video.mp4"
+        callback = make_upload_callback(project_id, os.path.getsize(output_path))
+        with stage("upload"):
+            upload_file_to_s3(output_path, s3_output_key, callback=callback)
 
-            job_status[project_id] = {"status": "done", "message": "Render complete"}
-
-    except Exception as e:
-        job_status[project_id] = {"status": "error", "message": str(e)}
+        set_status(project_id, "done", "Render complete")
 
 
 @router.post("/render/{project_id}")
-def start_render(project_id: str):
-    job_status[project_id] = {"status": "queued", "message": "Starting..."}
-    thread = threading.Thread(target=run_render_job, args=(project_id,))
+def start_render(project_id: str, profile: str = None):
+    # profile=cprofile or profile=pyinstrument captures a profile of the whole job
+    if profile and profile not in PROFILERS:
+        raise HTTPException(status_code=400, detail=f"profile must be one of: {', '.join(PROFILERS)}")
+    if profile and not profiler_available(profile):
+        raise HTTPException(status_code=400, detail=f"{profile} is not installed on this server")
+
+    # Only one render per project at a time, otherwise a page reload would start a
+    # second job that overwrites the first one's status and progress stream
+    with _start_lock:
+        if job_status.get(project_id, {}).get("status") in ("queued", "processing"):
+            raise HTTPException(status_code=409, detail="A render is already running for this project")
+        reset_progress(project_id)
+        set_status(project_id, "queued", "Starting...")
+
+    thread = threading.Thread(target=run_render_job, args=(project_id, profile))
     thread.daemon = True
     thread.start()
     return {"project_id": project_id, "status": "queued", "message": "Render started"}
@@ -102,7 +162,55 @@ def start_render(project_id: str):
 def get_status(project_id: str):
     if project_id not in job_status:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job_status[project_id]
+    return {**job_status[project_id], "metrics": get_job_metrics(project_id)}
+
+
+async def progress_stream(project_id: str, request: Request):
+    # Server-sent events: one "data:" line of JSON per progress event
+    queue = subscribe(project_id)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+
+            yield f"data: {json.dumps(event)}\n\n"
+            if event["type"] == "status" and event["status"] in ("done", "error"):
+                break
+    finally:
+        unsubscribe(project_id, queue)
+
+
+@router.get("/progress/{project_id}")
+def stream_progress(project_id: str, request: Request):
+    if project_id not in job_status:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        progress_stream(project_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/profile/{project_id}")
+def download_profile(project_id: str):
+    metrics = get_job_metrics(project_id)
+    if not metrics or not metrics["profile"]:
+        raise HTTPException(status_code=404, detail="No profile captured for this job")
+    path = get_profile_path(project_id, metrics["profile"])
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile is not ready yet")
+    return FileResponse(path, filename=os.path.basename(path))
 
 
 @router.get("/download/{project_id}")
@@ -3,13 +3,39 @@
 
 import os
 import uuid
+import shutil
 import tempfile
+import threading
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from typing import List
-from services.s3_storage import upload_fileobj_to_s3
+from services.s3_storage import upload_fileobj_to_s3, upload_file_to_s3
 
 router = APIRouter()
 
+def run_fingerprint_job(project_id: str, song_path: str, song_name: str):
+    # Fingerprint the song in the background so the upload returns right away
+    try:
+        from services.fingerprint_index import index_song
+        index_song(project_id, song_path, name=song_name)
+    except Exception as e:
+        print(f"Fingerprinting failed for {project_id}: {e}")
+    finally:
+        os.remove(song_path)
+
+def save_song_copy(song: UploadFile) -> str:
+    # Copy the song to disk before uploading it, because boto3 closes the file object
+    # it uploads from and the fingerprint job still needs the audio afterwards
+    suffix = os.path.splitext(song.filename)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(song.file, tmp)
+    return tmp.name
+
+def start_fingerprint_job(project_id: str, song_path: str, song_name: str):
+    # The fingerprint job deletes song_path when it's done with it
+    thread = threading.Thread(target=run_fingerprint_job, args=(project_id, song_path, song_name))
+    thread.daemon = True
+    thread.start()
+
 def is_valid_video(filename: str) -> bool:
     return filename.lower().endswith((".mp4", ".mov", ".avi"))
 
@@ -40,9 +66,15 @@ async def upload_files(
 
     project_id = str(uuid.uuid4())
 
-    # Upload song to S3
+    # Upload song to S3 from a local copy, which is then fingerprinted in the background
     song_key = f"projects/{project_id}/song/{song.filename}"
-    upload_fileobj_to_s3(song.file, song_key)
+    song_path = save_song_copy(song)
+    try:
+        upload_file_to_s3(song_path, song_key)
+    except Exception:
+        os.remove(song_path)
+        raise
+    start_fingerprint_job(project_id, song_path, song.filename)
 
     # Upload artist clips to S3
     saved_artist_clips = []
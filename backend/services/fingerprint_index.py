@@ -0,0 +1,253 @@
+# Audio fingerprint index - finds which song (and where in it) a clip's audio came from
+# Pairs of spectral peaks ("landmarks") are hashed into an inverted index, so a lookup
+# only touches the songs that share hashes with the clip instead of scanning every song
+# Copy and paste everything into backend/services/fingerprint_index.py
+
+import os
+import pickle
+import threading
+from collections import Counter
+import numpy as np
+import librosa
+from scipy.ndimage import maximum_filter
+
+# Same low sample rate the matching engine already extracts clip audio at
+SAMPLE_RATE = 11025
+N_FFT = 1024
+HOP_LENGTH = 256  # ~23ms per frame, which is also the offset precision
+
+# Peak picking: a bin is a peak if it is the loudest in its neighbourhood
+PEAK_NEIGHBORHOOD = (20, 20)  # (frequency bins, frames)
+PEAK_MIN_DB = -50
+# Only the loudest peaks in each ~1 second block are kept, so background noise
+# can't flood the fingerprint with peaks the clean song never had
+PEAK_BLOCK_FRAMES = 43
+PEAKS_PER_BLOCK = 15
+
+# Each peak is paired with the next few peaks inside its target zone
+FAN_OUT = 5
+MAX_DELTA_FRAMES = 255
+
+# A clip needs at least this many hashes lining up at the same offset to count as a match
+MIN_MATCHES = 5
+
+# A new song whose own landmarks match an indexed song this well, at offset zero,
+# is a re-upload and is recorded as an alias instead of being indexed again
+DUPLICATE_CONFIDENCE = 0.5
+DUPLICATE_MAX_OFFSET = 0.1
+
+INDEX_PATH = os.getenv("FINGERPRINT_INDEX_PATH", os.path.join("fingerprints", "index.pkl"))
+
+# The shared index is never changed in place: writers build an updated copy and swap it in,
+# so lookups read whichever index is current without waiting on a write or a save
+_index = None
+_load_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+
+def new_index() -> dict:
+    # hashes maps a landmark hash to every (song_id, frame) where it appears
+    # aliases maps a song_id whose song was already indexed under another id to that id
+    return {"hashes": {}, "songs": {}, "aliases": {}}
+
+
+def copy_index(index: dict) -> dict:
+    # Shallow copy: the hash lists are shared, and add_landmarks/remove_song replace
+    # lists instead of appending to them
+    return {
+        "hashes": dict(index["hashes"]),
+        "songs": dict(index["songs"]),
+        "aliases": dict(index["aliases"])
+    }
+
+
+def resolve_song_id(index: dict, song_id: str) -> str:
+    return index["aliases"].get(song_id, song_id)
+
+
+def find_peaks(y: np.ndarray) -> np.ndarray:
+    # Returns an array of (frequency_bin, frame) pairs sorted by frame
+    spectrum = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+    spectrum_db = librosa.amplitude_to_db(spectrum, ref=np.max)
+
+    local_max = maximum_filter(spectrum_db, size=PEAK_NEIGHBORHOOD) == spectrum_db
+    freqs, frames = np.nonzero(local_max & (spectrum_db > PEAK_MIN_DB))
+
+    # Rank peaks loudest first within each block, then drop everything past the cap
+    blocks = frames // PEAK_BLOCK_FRAMES
+    order = np.lexsort((-spectrum_db[freqs, frames], blocks))
+    blocks = blocks[order]
+    rank = np.arange(len(order)) - np.searchsorted(blocks, blocks)
+    keep = order[rank < PEAKS_PER_BLOCK]
+    freqs, frames = freqs[keep], frames[keep]
+
+    order = np.lexsort((freqs, frames))
+    return np.column_stack((freqs[order], frames[order]))
+
+
+def hash_landmark(freq_1: int, freq_2: int, delta_frames: int) -> int:
+    # 10 bits per frequency bin (N_FFT // 2 + 1 = 513 bins) and 8 bits for the time delta
+    return (int(freq_1) << 18) | (int(freq_2) << 8) | int(delta_frames)
+
+
+def fingerprint_samples(y: np.ndarray) -> list:
+    # Returns a list of (hash, anchor_frame) landmarks for mono audio at SAMPLE_RATE
+    if len(y) < N_FFT:
+        return []
+
+    peaks = find_peaks(y)
+    landmarks = []
+
+    for i in range(len(peaks)):
+        anchor_freq, anchor_frame = peaks[i]
+        paired = 0
+        for j in range(i + 1, len(peaks)):
+            target_freq, target_frame = peaks[j]
+            delta = target_frame - anchor_frame
+            if delta == 0:
+                continue
+            if delta > MAX_DELTA_FRAMES or paired >= FAN_OUT:
+                break
+            landmarks.append((hash_landmark(anchor_freq, target_freq, delta), int(anchor_frame)))
+            paired += 1
+
+    return landmarks
+
+
+def fingerprint_file(file_path: str, duration: float = None) -> list:
+    y, _ = librosa.load(file_path, sr=SAMPLE_RATE, mono=True, duration=duration)
+    return fingerprint_samples(y)
+
+
+def add_landmarks(index: dict, song_id: str, landmarks: list, info: dict = None):
+    # Re-indexing a song replaces its old entries instead of duplicating them
+    if song_id in index["songs"]:
+        remove_song(index, song_id)
+    index["aliases"].pop(song_id, None)
+
+    new_entries = {}
+    for landmark_hash, frame in landmarks:
+        new_entries.setdefault(landmark_hash, []).append((song_id, frame))
+
+    hashes = index["hashes"]
+    for landmark_hash, entries in new_entries.items():
+        hashes[landmark_hash] = hashes.get(landmark_hash, []) + entries
+
+    song_info = dict(info or {})
+    song_info["hash_count"] = len(landmarks)
+    index["songs"][song_id] = song_info
+
+
+def remove_song(index: dict, song_id: str):
+    hashes = index["hashes"]
+    for landmark_hash in list(hashes.keys()):
+        entries = [entry for entry in hashes[landmark_hash] if entry[0] != song_id]
+        if entries:
+            hashes[landmark_hash] = entries
+        else:
+            del hashes[landmark_hash]
+    index["songs"].pop(song_id, None)
+
+
+def lookup_landmarks(index: dict, landmarks: list, song_id: str = None) -> dict:
+    # Every shared hash votes for (song, song_frame - clip_frame)
+    # The true match shows up as many votes for the same song at the same offset
+    # Passing song_id only counts votes for that song, to find where in it a clip starts
+    if not landmarks:
+        return None
+
+    only_song = resolve_song_id(index, song_id) if song_id is not None else None
+    hashes = index["hashes"]
+    votes = Counter()
+    for landmark_hash, clip_frame in landmarks:
+        for entry_song, song_frame in hashes.get(landmark_hash, ()):
+            if only_song is None or entry_song == only_song:
+                votes[(entry_song, song_frame - clip_frame)] += 1
+
+    if not votes:
+        return None
+
+    (best_song, offset_frames), score = votes.most_common(1)[0]
+    if score < MIN_MATCHES:
+        return None
+
+    return {
+        "song_id": best_song,
+        "offset": round(offset_frames * HOP_LENGTH / SAMPLE_RATE, 3),
+        "score": score,
+        "confidence": round(score / len(landmarks), 3)
+    }
+
+
+def find_duplicate(index: dict, landmarks: list) -> str:
+    # Returns the id of an indexed song with the same audio, or None
+    match = lookup_landmarks(index, landmarks)
+    if (match and match["confidence"] >= DUPLICATE_CONFIDENCE
+            and abs(match["offset"]) <= DUPLICATE_MAX_OFFSET):
+        return match["song_id"]
+    return None
+
+
+def load_index(path: str = INDEX_PATH) -> dict:
+    if not os.path.exists(path):
+        return new_index()
+    with open(path, "rb") as f:
+        index = pickle.load(f)
+    index.setdefault("aliases", {})
+    return index
+
+
+def save_index(index: dict, path: str = INDEX_PATH):
+    # Write to a temp file first so a crash never leaves a half-written index behind
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def get_index() -> dict:
+    # The persisted index is loaded once per process and shared
+    global _index
+    with _load_lock:
+        if _index is None:
+            _index = load_index()
+        return _index
+
+
+def index_song(song_id: str, song_path: str, name: str = None) -> dict:
+    # Fingerprint a song and add it to the shared index on disk
+    landmarks = fingerprint_file(song_path)
+    duration = librosa.get_duration(path=song_path)
+    info = {"name": name or os.path.basename(song_path), "duration": round(duration, 2)}
+
+    global _index
+    with _write_lock:
+        current = get_index()
+        index = copy_index(current)
+
+        # A song used again in a new project points at its first copy rather than
+        # adding a second one that would tie with it in every lookup
+        duplicate = find_duplicate(current, landmarks)
+        if duplicate and duplicate != song_id:
+            index["aliases"][song_id] = duplicate
+        else:
+            add_landmarks(index, song_id, landmarks, info)
+
+        _index = index
+        save_index(index)
+    return index["songs"][resolve_song_id(index, song_id)]
+
+
+def has_song(song_id: str) -> bool:
+    index = get_index()
+    return song_id in index["songs"] or song_id in index["aliases"]
+
+
+def lookup_clip(clip_audio_path: str, duration: float = 30, song_id: str = None) -> dict:
+    # Returns {"song_id", "offset", "score", "confidence"} or None if nothing matches
+    # With song_id, only that song is searched and only the offset is of interest
+    landmarks = fingerprint_file(clip_audio_path, duration=duration)
+    return lookup_landmarks(get_index(), landmarks, song_id)
@@ -3,10 +3,12 @@
 # Copy and paste everything into backend/services/matching_engine.py
 
 import os
-import subprocess
 import numpy as np
 import librosa
 from moviepy import VideoFileClip
+from services.fingerprint_index import has_song, lookup_clip
+from services.pipeline_metrics import run_subprocess, clip_span
+from services.progress_events import publish_progress
 
 def extract_audio_ffmpeg(video_path: str, output_path: str, duration: int = 30) -> bool:
     # Use FFmpeg directly to extract audio - much faster than MoviePy
@@ -21,7 +23,7 @@ def extract_audio_ffmpeg(video_path: str, output_path: str, duration: int = 30)
             "-f", "wav",
             output_path
         ]
-        result = subprocess.run(cmd, capture_output=True, timeout=30)
+        result = run_subprocess(cmd, capture_output=True, timeout=30)
         return result.returncode == 0
     except Exception as e:
         print(f"FFmpeg extraction failed: {e}")
@@ -54,7 +56,7 @@ def get_clip_duration(clip_path: str) -> float:
             "-of", "csv=p=0",
             clip_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        result = run_subprocess(cmd, capture_output=True, text=True, timeout=10)
         return round(float(result.stdout.strip()), 3)
     except Exception:
         # Fallback to moviepy if ffprobe fails
@@ -64,38 +66,69 @@ def get_clip_duration(clip_path: str) -> float:
         return round(duration, 3)
 
 
-def match_artist_clips(song_path: str, artist_clips_dir: str, temp_dir: str) -> list:
-    placements = []
-    video_extensions = (".mp4", ".mov", ".avi")
+def match_artist_clip(song_path: str, clip_path: str, temp_dir: str,
+                      song_id: str = None, use_index: bool = False) -> dict:
+    # Returns the clip's placement on the song timeline, or None if it can't be placed
+    filename = os.path.basename(clip_path)
+    clip_audio_path = os.path.join(temp_dir, f"{filename}_audio.wav")
 
-    for filename in os.listdir(artist_clips_dir):
-        if not filename.lower().endswith(video_extensions):
-            continue
+    print(f"Extracting audio from {filename}...")
+    with clip_span(filename, "extract_audio"):
+        success = extract_audio_ffmpeg(clip_path, clip_audio_path)
+    if not success:
+        print(f"Could not extract audio from {filename}, skipping")
+        return None
 
-        clip_path = os.path.join(artist_clips_dir, filename)
-        clip_audio_path = os.path.join(temp_dir, f"{filename}_audio.wav")
+    try:
+        offset = None
+        if use_index:
+            print(f"Looking up {filename} in fingerprint index...")
+            # Only this project's song is searched, the index just supplies the offset
+            with clip_span(filename, "fingerprint_lookup"):
+                match = lookup_clip(clip_audio_path, song_id=song_id)
+            if match:
+                offset = max(match["offset"], 0.0)
+
+        if offset is None:
+            print(f"Finding sync offset for {filename}...")
+            with clip_span(filename, "sync_offset"):
+                offset = find_sync_offset(song_path, clip_audio_path)
+    finally:
+        if os.path.exists(clip_audio_path):
+            os.remove(clip_audio_path)
 
-        print(f"Extracting audio from {filename}...")
-        success = extract_audio_ffmpeg(clip_path, clip_audio_path)
-        if not success:
-            print(f"Could not extract audio from {filename}, skipping")
-            continue
+    duration = get_clip_duration(clip_path)
+    return {
+        "filename": filename,
+        "clip_path": clip_path,
+        "type": "artist",
+        "start_time": offset,
+        "end_time": round(offset + duration, 3),
+        "duration": duration
+    }
+
+
+def match_artist_clips(song_path: str, artist_clips_dir: str, temp_dir: str,
+                       song_id: str = None) -> list:
+    placements = []
+    video_extensions = (".mp4", ".mov", ".avi")
+    clip_files = [
+        f for f in os.listdir(artist_clips_dir)
+        if f.lower().endswith(video_extensions)
+    ]
 
-        print(f"Finding sync offset for {filename}...")
-        offset = find_sync_offset(song_path, clip_audio_path)
-        duration = get_clip_duration(clip_path)
+    # If the song has been fingerprinted we can look clips up in the index
+    # instead of cross-correlating against the whole song
+    use_index = song_id is not None and has_song(song_id)
 
-        placements.append({
-            "filename": filename,
-            "clip_path": clip_path,
-            "type": "artist",
-            "start_time": offset,
-            "end_time": round(offset + duration, 3),
-            "duration": duration
-        })
+    for i, filename in enumerate(clip_files, start=1):
+        clip_path = os.path.join(artist_clips_dir, filename)
+        placement = match_artist_clip(song_path, clip_path, temp_dir, song_id, use_index)
+        if placement:
+            placements.append(placement)
 
-        if os.path.exists(clip_audio_path):
-            os.remove(clip_audio_path)
+        publish_progress("match", done=i, total=len(clip_files), filename=filename,
+                         matched=placement is not None)
 
     placements.sort(key=lambda x: x["start_time"])
     return placements
@@ -167,7 +200,7 @@ def find_timeline_gaps(placements: list, song_duration: float) -> list:
 
 
 def build_edit_decision_list(song_path: str, project_dir: str,
-                              audio_analysis: dict) -> dict:
+                              audio_analysis: dict, song_id: str = None) -> dict:
     artist_dir = os.path.join(project_dir, "artist_clips")
     broll_dir = os.path.join(project_dir, "broll_clips")
     temp_dir = os.path.join(project_dir, "temp")
@@ -177,7 +210,7 @@ def build_edit_decision_list(song_path: str, project_dir: str,
     broll_placements = []
 
     if os.path.exists(artist_dir) and os.listdir(artist_dir):
-        artist_placements = match_artist_clips(song_path, artist_dir, temp_dir)
+        artist_placements = match_artist_clips(song_path, artist_dir, temp_dir, song_id)
 
     if os.path.exists(broll_dir) and os.listdir(broll_dir):
         broll_placements = match_broll_clips(
@@ -0,0 +1,246 @@
+# Pipeline metrics - timing spans, memory samples and ffmpeg/ffprobe durations for render jobs
+# Each render job runs in its own thread, so the job being measured is tracked per thread
+# and code deep in the services can record spans without having the job passed in
+# Memory can't be split per thread, so the RSS figures are for the whole process and each
+# job records how many jobs were running alongside it
+# Copy and paste everything into backend/services/pipeline_metrics.py
+
+import os
+import copy
+import time
+import uuid
+import resource
+import subprocess
+import threading
+import importlib.util
+from contextlib import contextmanager
+
+RSS_SAMPLE_INTERVAL = 0.5
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILERS = ("cprofile", "pyinstrument")
+
+# Structured metrics for the latest job of each project, keyed by project_id like
+# job_status in routes/render.py
+job_metrics = {}
+
+# Running totals across every job since startup, used for the Prometheus endpoint
+_totals = {"stages": {}, "clip_steps": {}, "subprocesses": {}, "jobs": {}}
+_totals_lock = threading.Lock()
+# Running jobs keyed by the token start_job_metrics hands out, so one job finishing
+# can never stop another job's sampler, even for the same project
+_running = {}
+_current = threading.local()
+
+
+def read_rss_bytes() -> int:
+    # Current resident memory from /proc, falling back to the process high-water mark
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _add_to_totals(group: str, name: str, seconds: float):
+    with _totals_lock:
+        total = _totals[group].setdefault(name, {"count": 0, "seconds": 0.0})
+        total["count"] += 1
+        total["seconds"] += seconds
+
+
+def _sample_rss(metrics: dict, stop: threading.Event):
+    # Track peak process memory while the job and each of its stages run
+    while not stop.wait(RSS_SAMPLE_INTERVAL):
+        rss = read_rss_bytes()
+        metrics["process_peak_rss_bytes"] = max(metrics["process_peak_rss_bytes"], rss)
+        metrics["max_concurrent_jobs"] = max(metrics["max_concurrent_jobs"], len(_running))
+        for entry in metrics["stages"]:
+            if entry["seconds"] is None:
+                entry["process_peak_rss_bytes"] = max(entry["process_peak_rss_bytes"], rss)
+
+
+def start_job_metrics(project_id: str) -> str:
+    # Returns the job token to pass to finish_job_metrics
+    metrics = {
+        "started_at": time.time(),
+        "total_seconds": None,
+        "process_peak_rss_bytes": read_rss_bytes(),
+        # Above 1, the process memory figures include other jobs' memory too
+        "max_concurrent_jobs": 1,
+        "stages": [],
+        "clips": [],
+        "subprocesses": [],
+        "profile": None
+    }
+    job_metrics[project_id] = metrics
+    _current.metrics = metrics
+
+    job_token = uuid.uuid4().hex
+    stop = threading.Event()
+    _running[job_token] = (metrics, stop)
+    metrics["max_concurrent_jobs"] = len(_running)
+    sampler = threading.Thread(target=_sample_rss, args=(metrics, stop))
+    sampler.daemon = True
+    sampler.start()
+    return job_token
+
+
+def finish_job_metrics(job_token: str, status: str):
+    metrics, stop = _running.pop(job_token, (None, None))
+    if stop:
+        stop.set()
+
+    if metrics:
+        metrics["total_seconds"] = round(time.time() - metrics["started_at"], 3)
+        metrics["process_peak_rss_bytes"] = max(metrics["process_peak_rss_bytes"], read_rss_bytes())
+
+    with _totals_lock:
+        _totals["jobs"][status] = _totals["jobs"].get(status, 0) + 1
+    _current.metrics = None
+
+
+def get_job_metrics(project_id: str) -> dict:
+    return job_metrics.get(project_id)
+
+
+@contextmanager
+def stage(name: str):
+    # Time one pipeline stage (download, analyze_audio, ...) of the current job
+    metrics = getattr(_current, "metrics", None)
+    entry = {"name": name, "seconds": None, "process_peak_rss_bytes": read_rss_bytes()}
+    if metrics is not None:
+        metrics["stages"].append(entry)
+
+    start = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        seconds = time.perf_counter() - start
+        entry["seconds"] = round(seconds, 3)
+        entry["process_peak_rss_bytes"] = max(entry["process_peak_rss_bytes"], read_rss_bytes())
+        _add_to_totals("stages", name, seconds)
+
+
+@contextmanager
+def clip_span(filename: str, step: str):
+    # Time one step of the work done for a single clip
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        metrics = getattr(_current, "metrics", None)
+        if metrics is not None:
+            metrics["clips"].append({"filename": filename, "step": step, "seconds": round(seconds, 3)})
+        _add_to_totals("clip_steps", step, seconds)
+
+
+def run_subprocess(cmd: list, **kwargs) -> subprocess.CompletedProcess:
+    # Drop-in for subprocess.run that records how long each ffmpeg/ffprobe call took
+    result = None
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(cmd, **kwargs)
+        return result
+    finally:
+        seconds = time.perf_counter() - start
+        command = os.path.basename(cmd[0])
+        metrics = getattr(_current, "metrics", None)
+        if metrics is not None:
+            metrics["subprocesses"].append({
+                "command": command,
+                "seconds": round(seconds, 3),
+                "returncode": result.returncode if result else None
+            })
+        _add_to_totals("subprocesses", command, seconds)
+
+
+def profiler_available(profiler: str) -> bool:
+    if profiler == "cprofile":
+        return True
+    if profiler == "pyinstrument":
+        return importlib.util.find_spec("pyinstrument") is not None
+    return False
+
+
+def get_profile_path(project_id: str, profiler: str) -> str:
+    extension = "prof" if profiler == "cprofile" else "html"
+    return os.path.join(PROFILE_DIR, f"{project_id}.{extension}")
+
+
+@contextmanager
+def profile_job(project_id: str, profiler: str = None):
+    # Opt-in profiling of everything the job thread does
+    # cProfile writes a .prof file for snakeviz/pstats, pyinstrument writes an HTML report
+    if not profiler:
+        yield
+        return
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = get_profile_path(project_id, profiler)
+    metrics = job_metrics.get(project_id)
+    if metrics is not None:
+        metrics["profile"] = profiler
+
+    if profiler == "cprofile":
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(path)
+    else:
+        from pyinstrument import Profiler
+        profile = Profiler()
+        profile.start()
+        try:
+            yield
+        finally:
+            profile.stop()
+            with open(path, "w") as f:
+                f.write(profile.output_html())
+
+
+def _format_labels(labels: dict) -> str:
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render_prometheus() -> str:
+    # Prometheus text exposition format (version 0.0.4)
+    with _totals_lock:
+        totals = copy.deepcopy(_totals)
+
+    lines = []
+    summaries = [
+        ("stages", "musicvideo_stage_seconds", "stage", "Time spent in each render pipeline stage"),
+        ("clip_steps", "musicvideo_clip_step_seconds", "step", "Time spent on each per-clip step"),
+        ("subprocesses", "musicvideo_subprocess_seconds", "command", "Time spent in ffmpeg/ffprobe calls")
+    ]
+    for group, metric, label, help_text in summaries:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} summary")
+        for name, values in sorted(totals[group].items()):
+            labels = _format_labels({label: name})
+            lines.append(f"{metric}_sum{labels} {values['seconds']:.6f}")
+            lines.append(f"{metric}_count{labels} {values['count']}")
+
+    lines.append("# HELP musicvideo_render_jobs_total Finished render jobs by final status")
+    lines.append("# TYPE musicvideo_render_jobs_total counter")
+    for status, count in sorted(totals["jobs"].items()):
+        lines.append(f"musicvideo_render_jobs_total{_format_labels({'status': status})} {count}")
+
+    lines.append("# HELP musicvideo_render_jobs_active Render jobs currently running")
+    lines.append("# TYPE musicvideo_render_jobs_active gauge")
+    lines.append(f"musicvideo_render_jobs_active {len(_running)}")
+
+    lines.append("# HELP process_resident_memory_bytes Resident memory size in bytes")
+    lines.append("# TYPE process_resident_memory_bytes gauge")
+    lines.append(f"process_resident_memory_bytes {read_rss_bytes()}")
+
+    return "\n".join(lines) + "\n"
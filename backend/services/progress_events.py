@@ -0,0 +1,74 @@
+# Progress event bus - pushes fine-grained render progress to listeners as it happens
+# Render jobs run in worker threads and publish here, while the SSE endpoint listens on
+# an asyncio queue, so events are handed to the listener's event loop thread-safely
+# Copy and paste everything into backend/services/progress_events.py
+
+import asyncio
+import itertools
+import threading
+import time
+
+# Latest event of each type per project, so a new listener can catch up straight away
+latest_progress = {}
+
+_subscribers = {}
+_sequence = itertools.count(1)
+_lock = threading.Lock()
+_current = threading.local()
+
+
+def set_current_job(project_id: str):
+    # Lets services publish progress without having the project_id passed in
+    _current.project_id = project_id
+
+
+def clear_current_job():
+    _current.project_id = None
+
+
+def reset_progress(project_id: str):
+    with _lock:
+        latest_progress.pop(project_id, None)
+
+
+def publish(project_id: str, event_type: str, **data) -> dict:
+    with _lock:
+        # The sequence number keeps events in publish order even when timestamps tie
+        event = {"type": event_type, "id": next(_sequence), "time": round(time.time(), 3), **data}
+        latest_progress.setdefault(project_id, {})[event_type] = event
+        subscribers = list(_subscribers.get(project_id, []))
+
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+        except RuntimeError:
+            # The listener's event loop has already shut down
+            pass
+    return event
+
+
+def publish_progress(event_type: str, **data):
+    # Publish for whichever job the current thread is working on, if any
+    project_id = getattr(_current, "project_id", None)
+    if project_id is not None:
+        publish(project_id, event_type, **data)
+
+
+def subscribe(project_id: str) -> asyncio.Queue:
+    # Must be called from inside the event loop that will read the queue
+    queue = asyncio.Queue()
+    with _lock:
+        _subscribers.setdefault(project_id, []).append((asyncio.get_running_loop(), queue))
+        snapshot = sorted(latest_progress.get(project_id, {}).values(), key=lambda e: e["id"])
+
+    for event in snapshot:
+        queue.put_nowait(event)
+    return queue
+
+
+def unsubscribe(project_id: str, queue: asyncio.Queue):
+    with _lock:
+        subscribers = _subscribers.get(project_id, [])
+        subscribers[:] = [entry for entry in subscribers if entry[1] is not queue]
+        if not subscribers:
+            _subscribers.pop(project_id, None)
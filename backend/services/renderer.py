@@ -3,6 +3,28 @@
 
 import os
 from moviepy import VideoFileClip, AudioFileClip, concatenate_videoclips, ColorClip
+from proglog import ProgressBarLogger
+from services.pipeline_metrics import clip_span, stage
+from services.progress_events import publish_progress
+
+
+class RenderProgressLogger(ProgressBarLogger):
+    # MoviePy pipes frames into ffmpeg itself and reports them through proglog,
+    # so frame progress comes from its "frame_index" bar instead of ffmpeg -progress
+    def __init__(self):
+        super().__init__()
+        self.last_percent = None
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if bar != "frame_index" or attr != "index":
+            return
+        total = self.bars[bar]["total"]
+        percent = int((value + 1) * 100 / total) if total else 0
+        # One event per percent is plenty and keeps listener queues small
+        if percent != self.last_percent:
+            self.last_percent = percent
+            publish_progress("render", frame=value + 1, total_frames=total, percent=percent)
+
 
 def render_music_video(edit_decision_list: dict, output_dir: str) -> str:
     song_path = edit_decision_list["song_path"]
@@ -36,13 +58,14 @@ def render_music_video(edit_decision_list: dict, output_dir: str) -> str:
             black = black.with_fps(fps)
             timeline_clips.append(black)
 
-        # Load and trim the clip to its intended duration
-        clip = VideoFileClip(clip_path)
-        clip = clip.subclipped(0, min(duration, clip.duration))
+        with clip_span(placement["filename"], "load"):
+            # Load and trim the clip to its intended duration
+            clip = VideoFileClip(clip_path)
+            clip = clip.subclipped(0, min(duration, clip.duration))
 
-        # Resize to match the first clip's resolution if different
-        if clip.size != video_size:
-            clip = clip.resized(video_size)
+            # Resize to match the first clip's resolution if different
+            if clip.size != video_size:
+                clip = clip.resized(video_size)
 
         timeline_clips.append(clip)
         current_time = start_time + duration
@@ -65,14 +88,16 @@ def render_music_video(edit_decision_list: dict, output_dir: str) -> str:
     final_video = final_video.with_audio(song_audio)
 
     # Export the final video
+    # MoviePy drives ffmpeg itself here, so the encode is timed as its own stage
     output_path = os.path.join(output_dir, "music_video.mp4")
-    final_video.write_videofile(
-        output_path,
-        codec="libx264",
-        audio_codec="aac",
-        fps=fps,
-        logger=None
-    )
+    with stage("render.encode"):
+        final_video.write_videofile(
+            output_path,
+            codec="libx264",
+            audio_codec="aac",
+            fps=fps,
+            logger=RenderProgressLogger()
+        )
 
     # Clean up
     for clip in timeline_clips:
@@ -2,24 +2,36 @@
 # Copy and paste everything into backend/services/s3_storage.py
 
 import os
-import boto3
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
-s3_client = boto3.client(
-    "s3",
-    region_name=os.getenv("AWS_REGION"),
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-)
-
 BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
 
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    # boto3 is slow to import, so the client is only built the first time S3 is used
+    global _s3_client
+    with _s3_client_lock:
+        if _s3_client is None:
+            import boto3
+            _s3_client = boto3.client(
+                "s3",
+                region_name=os.getenv("AWS_REGION"),
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+            )
+        return _s3_client
+
 
-def upload_file_to_s3(local_path: str, s3_key: str) -> str:
+def upload_file_to_s3(local_path: str, s3_key: str, callback=None) -> str:
     # Upload a local file to S3 and return its public URL
-    s3_client.upload_file(local_path, BUCKET_NAME, s3_key)
+    # callback is called with the number of bytes sent each time a chunk goes out
+    get_s3_client().upload_file(local_path, BUCKET_NAME, s3_key, Callback=callback)
     url = f"https://{BUCKET_NAME}.s3.{os.getenv('AWS_REGION')}.amazonaws.com/{s3_key}"
     return url
 
@@ -27,19 +39,19 @@ def upload_file_to_s3(local_path: str, s3_key: str) -> str:
 def download_file_from_s3(s3_key: str, local_path: str):
     # Download a file from S3 to local disk
     os.makedirs(os.path.dirname(local_path), exist_ok=True)
-    s3_client.download_file(BUCKET_NAME, s3_key, local_path)
+    get_s3_client().download_file(BUCKET_NAME, s3_key, local_path)
 
 
 def upload_fileobj_to_s3(file_obj, s3_key: str) -> str:
     # Upload a file object directly to S3
-    s3_client.upload_fileobj(file_obj, BUCKET_NAME, s3_key)
+    get_s3_client().upload_fileobj(file_obj, BUCKET_NAME, s3_key)
     url = f"https://{BUCKET_NAME}.s3.{os.getenv('AWS_REGION')}.amazonaws.com/{s3_key}"
     return url
 
 
 def get_presigned_url(s3_key: str, expiry: int = 3600) -> str:
     # Generate a temporary URL for downloading a file
-    url = s3_client.generate_presigned_url(
+    url = get_s3_client().generate_presigned_url(
         "get_object",
         Params={"Bucket": BUCKET_NAME, "Key": s3_key},
         ExpiresIn=expiry
@@ -0,0 +1,68 @@
+# Warm-up for the heavy media stack
+# Importing librosa, MoviePy and OpenCV and compiling librosa's numba functions takes seconds,
+# so this runs either in the build step (to fill the numba cache on disk ahead of time)
+# or in a background thread after startup (so the first render doesn't pay for it)
+# Run from the backend folder: python -m services.warmup
+# Copy and paste everything into backend/services/warmup.py
+
+import os
+import json
+import time
+import tempfile
+import threading
+
+NUMBA_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".numba_cache")
+
+
+def enable_numba_cache():
+    # numba reads this when it is first imported, so it has to be set before librosa loads
+    os.environ.setdefault("NUMBA_CACHE_DIR", NUMBA_CACHE_DIR)
+
+
+def warm_media_stack() -> dict:
+    # Returns how long each part of the warm-up took, in seconds
+    enable_numba_cache()
+    timings = {}
+
+    start = time.perf_counter()
+    import numpy as np
+    import soundfile
+    import services.video_analysis
+    import services.matching_engine
+    import services.renderer
+    from services.audio_analysis import analyze_audio
+    from services.fingerprint_index import fingerprint_samples, SAMPLE_RATE
+    timings["imports"] = round(time.perf_counter() - start, 3)
+
+    # Running the real analysis once on a short click track compiles librosa's numba
+    # functions, or loads them from the cache if the build step already did
+    start = time.perf_counter()
+    sr = 22050
+    y = np.random.default_rng(0).normal(0, 0.05, sr * 5).astype(np.float32)
+    y[::sr // 2] = 1.0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        song_path = os.path.join(tmp_dir, "warmup.wav")
+        soundfile.write(song_path, y, sr)
+        analyze_audio(song_path)
+    fingerprint_samples(y[:SAMPLE_RATE * 5])
+    timings["first_analysis"] = round(time.perf_counter() - start, 3)
+
+    return timings
+
+
+def prewarm_in_background():
+    # Load the media stack without holding up server startup
+    def run():
+        try:
+            timings = warm_media_stack()
+            print(f"Media stack warmed up: {timings}")
+        except Exception as e:
+            print(f"Media stack warm-up failed: {e}")
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+
+
+if __name__ == "__main__":
+    print(json.dumps(warm_media_stack(), indent=2))
@@ -1,4 +1,4 @@
-// Processing screen - polls backend every 5 seconds to check render status
+// Processing screen - listens to live progress events from the backend while the video renders
 // Copy and paste everything into frontend/src/pages/Processing.jsx
 
 import { useEffect, useState } from 'react'
@@ -15,47 +15,110 @@ const STEPS = [
   'Rendering your music video...',
 ]
 
+// Which step to highlight for each backend pipeline stage
+const STAGE_STEPS = {
+  download: 0,
+  analyze_audio: 0,
+  build_edit_decision_list: 1,
+  render_music_video: 4,
+  upload: 4,
+}
+
+// Turn a progress event into a short line for under the status message
+function describeProgress(event) {
+  switch (event.type) {
+    case 'download':
+      return `Downloaded ${event.done} of ${event.total} files`
+    case 'match':
+      return `Matched ${event.done} of ${event.total} clips`
+    case 'render':
+      return `Rendering ${event.percent}% (frame ${event.frame} of ${event.total_frames})`
+    case 'upload':
+      return `Uploading ${event.percent}%`
+    default:
+      return ''
+  }
+}
+
 export default function Processing() {
   const { projectId } = useParams()
   const navigate = useNavigate()
   const [stepIndex, setStepIndex] = useState(0)
   const [statusMsg, setStatusMsg] = useState('Starting...')
+  const [progressMsg, setProgressMsg] = useState('')
   const [error, setError] = useState('')
 
   useEffect(() => {
-    // Start the render job immediately
-    axios.post(`${API}/render/${projectId}`).catch(() => {})
-
-    // Cycle through steps visually
-    const stepInterval = setInterval(() => {
-      setStepIndex(prev => (prev < STEPS.length - 1 ? prev + 1 : prev))
-    }, 6000)
-
-    // Poll status every 5 seconds
-    const pollInterval = setInterval(async () => {
-      try {
-        const res = await axios.get(`${API}/status/${projectId}`)
-        setStatusMsg(res.data.message)
-
-        if (res.data.status === 'done') {
-          clearInterval(pollInterval)
-          clearInterval(stepInterval)
-          navigate(`/preview/${projectId}`)
+    let events = null
+    let closed = false
+
+    const connect = () => {
+      if (closed) return
+      const source = new EventSource(`${API}/progress/${projectId}`)
+      events = source
+
+      source.onmessage = (message) => {
+        const event = JSON.parse(message.data)
+
+        if (event.type === 'status') {
+          setStatusMsg(event.message)
+          if (event.stage in STAGE_STEPS) setStepIndex(STAGE_STEPS[event.stage])
+
+          if (event.status === 'done') {
+            source.close()
+            navigate(`/preview/${projectId}`)
+          }
+
+          if (event.status === 'error') {
+            source.close()
+            setError(event.message)
+          }
+          return
         }
 
-        if (res.data.status === 'error') {
-          clearInterval(pollInterval)
-          clearInterval(stepInterval)
-          setError(res.data.message)
+        if (event.type === 'match') {
+          setStepIndex(event.done < event.total ? 2 : 3)
+        }
+        setProgressMsg(describeProgress(event))
+      }
+
+      // EventSource retries dropped connections by itself, but gives up for good on
+      // responses like a 404, so ask /status what happened to the job
+      source.onerror = async () => {
+        try {
+          const res = await axios.get(`${API}/status/${projectId}`)
+          if (closed) return
+
+          if (res.data.status === 'done') {
+            source.close()
+            navigate(`/preview/${projectId}`)
+          } else if (res.data.status === 'error') {
+            source.close()
+            setError(res.data.message)
+          } else if (source.readyState === EventSource.CLOSED) {
+            // Job is still running but the stream gave up, so open a new one
+            setTimeout(connect, 3000)
+          }
+        } catch (err) {
+          if (closed) return
+          if (err.response && err.response.status === 404) {
+            source.close()
+            setError('This render job was not found. The server may have restarted, please try again.')
+          } else if (source.readyState === EventSource.CLOSED) {
+            setTimeout(connect, 3000)
+          }
         }
-      } catch (err) {
-        // Keep polling even if one request fails
       }
-    }, 5000)
+    }
+
+    // Start the render job, then open one push connection for its progress
+    axios.post(`${API}/render/${projectId}`)
+      .catch(() => {})
+      .finally(connect)
 
     return () => {
-      clearInterval(pollInterval)
-      clearInterval(stepInterval)
+      closed = true
+      if (events) events.close()
     }
   }, [projectId])
 
@@ -88,6 +151,8 @@ export default function Processing() {
 
         <p style={styles.status}>{statusMsg}</p>
 
+        {progressMsg && <p style={styles.progress}>{progressMsg}</p>}
+
         {error && <p style={styles.error}>Error: {error}</p>}
 
         <p style={styles.note}>This takes a few minutes. Don't close this tab.</p>
@@ -159,6 +224,11 @@ const styles = {
     fontSize: '12px',
     letterSpacing: '0.05em',
   },
+  progress: {
+    color: 'var(--text-dim)',
+    fontSize: '12px',
+    letterSpacing: '0.05em',
+  },
   note: {
     color: 'var(--text-dim)',
     fontSize: '12px',